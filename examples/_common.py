@@ -0,0 +1,64 @@
+"""Helpers shared by the example scripts."""
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import DefaultDict, Iterator, List, Tuple
+
+import requests
+
+from pyvera import VeraController, VeraDevice
+
+def by_class(devices: List[VeraDevice]) -> DefaultDict[type, List[VeraDevice]]:
+    """Group the devices under their class and each of its base classes."""
+    index: DefaultDict[type, List[VeraDevice]] = defaultdict(list)
+    for device in devices:
+        # Skip object at the end of the MRO, nothing asks for it
+        for cls in type(device).__mro__[:-1]:
+            index[cls].append(device)
+
+    return index
+
+
+@contextmanager
+def vera(url: str) -> Iterator[Tuple[VeraController, List[VeraDevice]]]:
+    """Connect to the Vera, fetch its devices and run the subscription thread.
+
+    The devices are fetched before the thread is started so a bad URL raises
+    straight away rather than leaving the thread retrying in the background.
+    The controller's get_device_by_id and get_device_by_name then look them
+    up without asking the Vera again. The thread is stopped again when the
+    block exits.
+    """
+    controller = VeraController(url)
+    devices = controller.get_devices()
+    controller.start()
+    try:
+        yield controller, devices
+    finally:
+        # Stop the subscription listening thread so we can quit
+        controller.stop()
+
+
+def poll_schedule(first: float, budget: float, factor: float = 2.0) -> Iterator[float]:
+    """Yield poll delays that start short and grow until the budget is spent.
+
+    Most state changes land within the first few seconds, so polling early and
+    backing off afterwards spots them sooner than a fixed interval would.
+    """
+    elapsed = 0.0
+    delay = first
+    while elapsed < budget:
+        delay = min(delay, budget - elapsed)
+        yield delay
+        elapsed += delay
+        delay *= factor
+
+
+def report_lock_command(result: requests.Response) -> None:
+    """Print whether the Vera accepted a door code command."""
+    if result.status_code == 200:
+        print(
+            "\nCommand succesfully sent to Lock \
+        \nWait for the lock to process the request"
+        )
+    else:
+        print("\nLock command " + result.text)
@@ -1,56 +1,49 @@
-#!/usr/bin/env python
 """Example script."""
 
 # Parse Arguments
-# Import project path
 import argparse
-import os
-import sys
+import functools
+from typing import List, Optional
 
 # Import pyvera
-from pyvera import VeraController, VeraLock
+from pyvera import VeraLock
 
+from ._common import report_lock_command, vera
 
-def main() -> None:
-    """Run main code entrypoint."""
-    sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
 
-    parser = argparse.ArgumentParser(description="set-and-delete-door-code")
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser once."""
+    parser = argparse.ArgumentParser(description="delete-door-code")
     parser.add_argument(
         "-u", "--url", help="Vera URL, e.g. http://192.168.1.161:3480;", required=True
     )
     parser.add_argument("-n", "--name", help='Name eg: "John Doe"', required=True)
     parser.add_argument("-i", "--id", help='Device ID: "123"', required=True)
-    args = parser.parse_args()
+    return parser
+
+
+def delete_door_code(device: VeraLock, name: str) -> None:
+    """Remove the door code with the given name from a lock."""
+    name_to_slot = {code: slot for slot, code, _ in device.get_pin_codes()}
+    found_slot = name_to_slot.get(name)
+    if found_slot is None:
+        print("No matching slot found\n")
+        return
 
-    # Start the controller
-    controller = VeraController(args.url)
-    controller.start()
+    report_lock_command(device.clear_slot_pin(slot=int(found_slot)))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run main code entrypoint."""
+    args = _build_parser().parse_args(argv)
 
-    try:
+    # Start the controller, it is stopped again when the block exits
+    with vera(args.url) as (controller, _):
         device = controller.get_device_by_id(int(args.id))
 
         if isinstance(device, VeraLock):
-            pins = device.get_pin_codes()
-            found_slot = None
-            for slot, name, _ in pins:
-                if name == args.name:
-                    found_slot = slot
-            if found_slot is None:
-                print("No matching slot found\n")
-                return
-            result = device.clear_slot_pin(slot=int(found_slot))
-            if result.status_code == 200:
-                print(
-                    "\nCommand succesfully sent to Lock \
-                \nWait for the lock to process the request"
-                )
-            else:
-                print("\nLock command " + result.text)
-
-    finally:
-        # Stop the subscription listening thread so we can quit
-        controller.stop()
+            delete_door_code(device, args.name)
 
 
 if __name__ == "__main__":
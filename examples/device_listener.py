@@ -1,37 +1,34 @@
-#!/usr/bin/env python
 """Example script."""
 
 # Parse Arguments
-# Import project path
 import argparse
-import os
+import functools
+import signal
 import sys
-import time
+import threading
+from typing import List, Optional
 
 # Import pyvera
-from pyvera import VeraController, VeraDevice
+from pyvera import VeraDevice
+
+from ._common import vera
 
 
 # Define a callback that runs each time a device changes state
 def device_info_callback(vera_device: VeraDevice) -> None:
     """Print device info."""
-    # Do what we want with the changed device information
-    print(
-        "{}_{} values: {}".format(
-            vera_device.name, vera_device.device_id, vera_device.get_all_values()
-        )
-    )
-    print(
-        "{}_{} alerts: {}".format(
-            vera_device.name, vera_device.device_id, vera_device.get_alerts()
-        )
+    # Do what we want with the changed device information. This runs on the
+    # subscription thread, so emit both lines with a single write.
+    prefix = f"{vera_device.name}_{vera_device.device_id}"
+    sys.stdout.write(
+        f"{prefix} values: {vera_device.get_all_values()}\n"
+        f"{prefix} alerts: {vera_device.get_alerts()}\n"
     )
 
 
-def main() -> None:
-    """Run main code entrypoint."""
-    sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
-
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser once."""
     parser = argparse.ArgumentParser(description="device-listener")
     parser.add_argument(
         "-u", "--url", help="Vera URL, e.g. http://192.168.1.161:3480", required=True
@@ -44,14 +41,15 @@ def main() -> None:
     group.add_argument(
         "-n", "--name", help="The Vera Device name string for subscription"
     )
-    args = parser.parse_args()
+    return parser
+
 
-    # Start the controller
-    controller = VeraController(args.url)
-    controller.start()
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run main code entrypoint."""
+    args = _build_parser().parse_args(argv)
 
-    try:
-        # Get the requested device on the vera controller
+    # Start the controller, it is stopped again when the block exits
+    with vera(args.url) as (controller, _):
         found_device = None
         if args.name is not None:
             found_device = controller.get_device_by_name(args.name)
@@ -74,20 +72,22 @@ def main() -> None:
         print("Initial values: {}".format(found_device.get_all_values()))
         print("Initial alerts: {}".format(found_device.get_alerts()))
 
-        # Loop until someone hits Ctrl-C to interrupt the listener
+        # Block until someone hits Ctrl-C to interrupt the listener, changes are
+        # delivered to the callback by the subscription thread. Ctrl-C sets the
+        # event, the wait has a timeout as the handler can't run during an
+        # untimed wait on Windows.
+        stop = threading.Event()
+        previous_handler = signal.signal(signal.SIGINT, lambda *_: stop.set())
         try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            print("Got interrupted by user")
+            while not stop.wait(1):
+                pass
+        finally:
+            signal.signal(signal.SIGINT, previous_handler)
+        print("Got interrupted by user")
 
         # Unregister our callback
         controller.unregister(found_device, device_info_callback)
 
-    finally:
-        # Stop the subscription listening thread so we can quit
-        controller.stop()
-
 
 if __name__ == "__main__":
     main()
@@ -1,46 +1,40 @@
-#!/usr/bin/env python
 """Example script."""
 
 # Parse Arguments
-# Import project path
 import argparse
-import os
-import sys
+import functools
+from typing import List, Optional, cast
 
 # Import pyvera
-from pyvera import VeraController, VeraGarageDoor
+from pyvera import VeraGarageDoor
 
+from ._common import by_class, vera
 
-def main() -> None:
-    """Run main code entrypoint."""
-    sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
 
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser once."""
     parser = argparse.ArgumentParser(description="list-devices")
     parser.add_argument(
         "-u", "--url", help="Vera URL, e.g. http://192.168.1.161:3480", required=True
     )
     parser.add_argument("--close", help="Close garage door(s)", action="store_true")
-    args = parser.parse_args()
-
-    # Start the controller
-    controller = VeraController(args.url)
-    controller.start()
-
-    try:
-        # Get a list of all the devices on the vera controller
-        all_devices = controller.get_devices()
-
-        # Open/close all garage doors.
-        for device in all_devices:
-            if isinstance(device, VeraGarageDoor):
-                if args.close:
-                    device.switch_off()
-                else:
-                    device.switch_on()
-
-    finally:
-        # Stop the subscription listening thread so we can quit
-        controller.stop()
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run main code entrypoint."""
+    args = _build_parser().parse_args(argv)
+
+    # Start the controller, it is stopped again when the block exits
+    with vera(args.url) as (controller, all_devices):
+        garage_doors = cast(List[VeraGarageDoor], by_class(all_devices)[VeraGarageDoor])
+
+        # Open/close all garage doors, each command is its own round trip to
+        # the Vera so let the controller send them concurrently.
+        controller.run_in_parallel(
+            door.switch_off if args.close else door.switch_on for door in garage_doors
+        )
 
 
 if __name__ == "__main__":
@@ -1,45 +1,36 @@
-#!/usr/bin/env python
 """Example script."""
 
 # Parse Arguments
-# Import project path
 import argparse
-import os
+import functools
 import sys
+from typing import List, Optional
 
-# Import pyvera
-from pyvera import VeraController
+from ._common import vera
 
 
-def main() -> None:
-    """Run main code entrypoint."""
-    sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
-
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser once."""
     parser = argparse.ArgumentParser(description="list-devices")
     parser.add_argument(
         "-u", "--url", help="Vera URL, e.g. http://192.168.1.161:3480", required=True
     )
-    args = parser.parse_args()
-
-    # Start the controller
-    controller = VeraController(args.url)
-    controller.start()
-
-    try:
-        # Get a list of all the devices on the vera controller
-        all_devices = controller.get_devices()
-
-        # Print the devices out
-        for device in all_devices:
-            print(
-                "{} {} ({})".format(
-                    type(device).__name__, device.name, device.device_id
-                )
-            )
-
-    finally:
-        # Stop the subscription listening thread so we can quit
-        controller.stop()
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run main code entrypoint."""
+    args = _build_parser().parse_args(argv)
+
+    # Start the controller, it is stopped again when the block exits
+    with vera(args.url) as (_, all_devices):
+        # Print the devices out with a single write
+        lines = [
+            f"{device.__class__.__name__} {device.name} ({device.device_id})\n"
+            for device in all_devices
+        ]
+        sys.stdout.write("".join(lines))
 
 
 if __name__ == "__main__":
@@ -1,72 +1,102 @@
-#!/usr/bin/env python
 """Example script."""
 
 # Parse Arguments
-# Import project path
 import argparse
-import os
+import functools
 import sys
-import time
-from typing import cast
+import threading
+from typing import List, Optional, Set, cast
 
 # Import pyvera
-from pyvera import VeraController, VeraDevice, VeraLock
+from pyvera import LOCK_TARGET_TIMEOUT_SEC, VeraDevice, VeraLock
 
+from ._common import by_class, poll_schedule, vera
 
-# Define a callback that runs each time a device changes state
-def device_info_callback(vera_device: VeraDevice) -> None:
-    """Print device info."""
-    device = cast(VeraLock, vera_device)
-    # Do what we want with the changed device information
-    print(
-        "{}_{}: locked={}".format(
-            vera_device.name, vera_device.device_id, device.is_locked()
-        )
-    )
-
-
-def main() -> None:
-    """Run main code entrypoint."""
-    sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
 
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser once."""
     parser = argparse.ArgumentParser(description="lock-all-doors-with-status")
     parser.add_argument(
         "-u", "--url", help="Vera URL, e.g. http://192.168.1.161:3480", required=True
     )
-    args = parser.parse_args()
-
-    # Start the controller
-    controller = VeraController(args.url)
-    controller.start()
-
-    try:
-        # Get a list of all the devices on the vera controller
-        all_devices = controller.get_devices()
-
-        # Look over the list and find the lock devices
-        lock_devices = []
-        for device in all_devices:
-            if isinstance(device, VeraLock):
-                # Register a callback that runs when the info for that device is updated
-                controller.register(device, device_info_callback)
-                print(
-                    "Initially, {}_{}: locked={}".format(
-                        device.name, device.device_id, device.is_locked()
-                    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run main code entrypoint."""
+    args = _build_parser().parse_args(argv)
+
+    lock_devices: List[VeraLock] = []
+    # Ids of the locks we are still waiting on
+    remaining: Set[int] = set()
+    all_locked = threading.Event()
+    # The subscription thread and the main thread both update the two above
+    state_lock = threading.Lock()
+
+    # Define a callback that runs each time a device changes state
+    def device_info_callback(vera_device: VeraDevice) -> None:
+        """Print device info."""
+        device = cast(VeraLock, vera_device)
+        locked = device.is_locked()
+        # Do what we want with the changed device information
+        sys.stdout.write(
+            f"{vera_device.name}_{vera_device.device_id}: locked={locked}\n"
+        )
+        # Only the device that changed needs checking, wake up the main thread
+        # once the last lock has reported in
+        with state_lock:
+            if locked:
+                remaining.discard(vera_device.device_id)
+                if not remaining:
+                    all_locked.set()
+            else:
+                remaining.add(vera_device.device_id)
+                all_locked.clear()
+
+    # Start the controller, it is stopped again when the block exits
+    with vera(args.url) as (controller, all_devices):
+        lock_devices.extend(cast(List[VeraLock], by_class(all_devices)[VeraLock]))
+        locks_by_id = {d.device_id: d for d in lock_devices}
+        remaining.update(d.device_id for d in lock_devices if not d.is_locked())
+        if not remaining:
+            all_locked.set()
+
+        for device in lock_devices:
+            # Register a callback that runs when the info for that device is updated
+            controller.register(device, device_info_callback)
+            print(
+                "Initially, {}_{}: locked={}".format(
+                    device.name, device.device_id, device.is_locked()
                 )
-                lock_devices.append(device)
-                if not device.is_locked():
-                    device.lock()
+            )
+            if device.device_id in remaining:
+                device.lock()
 
-        # Loop until someone hits Ctrl-C to interrupt the listener
+        # Block until the callbacks report every door locked or someone hits
+        # Ctrl-C to interrupt the listener
         try:
-            all_locked = False
-            while not all_locked:
-                time.sleep(1)
-                all_locked = True
-                for device in lock_devices:
-                    if not device.is_locked():
-                        all_locked = False
+            # Subscription updates can go missing, so while the locks are most
+            # likely to settle check on them ourselves, less often as time goes on
+            for delay in poll_schedule(0.5, LOCK_TARGET_TIMEOUT_SEC):
+                if all_locked.wait(timeout=delay):
+                    break
+                # Only the locks still outstanding need asking about. Hold the
+                # lock throughout, so a callback can't re-add one in between.
+                with state_lock:
+                    remaining.difference_update(
+                        [
+                            device_id
+                            for device_id in list(remaining)
+                            if locks_by_id[device_id].is_locked(refresh=True)
+                        ]
+                    )
+                    if not remaining:
+                        all_locked.set()
+
+            # Wait with a timeout, an untimed wait can't be interrupted on Windows
+            while not all_locked.wait(1):
+                pass
             print("All doors are now locked")
 
         except KeyboardInterrupt:
@@ -76,10 +106,6 @@ def main() -> None:
         for device in lock_devices:
             controller.unregister(device, device_info_callback)
 
-    finally:
-        # Stop the subscription listening thread so we can quit
-        controller.stop()
-
 
 if __name__ == "__main__":
     main()
@@ -1,56 +1,53 @@
-#!/usr/bin/env python
 """Example script."""
 
 # Parse Arguments
-# Import project path
 import argparse
-import os
-import sys
+import functools
+from typing import List, Optional
 
 # Import pyvera
-from pyvera import VeraController, VeraLock
+from pyvera import VeraLock
 
+from ._common import report_lock_command, vera
 
-def main() -> None:
-    """Run main code entrypoint."""
-    sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
 
-    parser = argparse.ArgumentParser(description="set-and-delete-door-code")
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser once."""
+    parser = argparse.ArgumentParser(description="set-door-code")
     parser.add_argument(
         "-u", "--url", help="Vera URL, e.g. http://192.168.1.161:3480;", required=True
     )
     parser.add_argument("-n", "--name", help='Name eg: "John Doe"', required=True)
     parser.add_argument("-p", "--pin", help='Pin eg: "5678"', required=True)
     parser.add_argument("-i", "--id", help='Device ID: "123"', required=True)
-    args = parser.parse_args()
+    return parser
+
+
+def set_door_code(device: VeraLock, name: str, pin: int) -> None:
+    """Add a door code to a lock."""
+    # show exisiting door codes
+    print("Existing door codes:\n {}".format(device.get_pin_codes()))
+
+    # set a new door code
+    result = device.set_new_pin(name=name, pin=pin)
 
-    # Start the controller
-    controller = VeraController(args.url)
-    controller.start()
+    # printing the status code and error if any for debug logs
+    # print("status:"+str(result.status_code), result.text)
+
+    report_lock_command(result)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run main code entrypoint."""
+    args = _build_parser().parse_args(argv)
 
-    try:
+    # Start the controller, it is stopped again when the block exits
+    with vera(args.url) as (controller, _):
         device = controller.get_device_by_id(int(args.id))
 
         if isinstance(device, VeraLock):
-            # show exisiting door codes
-            print("Existing door codes:\n {}".format(device.get_pin_codes()))
-
-            # set a new door code
-            result = device.set_new_pin(name=args.name, pin=args.pin)
-
-            # printing the status code and error if any for debug logs
-            # print("status:"+str(result.status_code), result.text)
-
-            if result.status_code == 200:
-                print(
-                    "\nCommand succesfully sent to Lock \
-                \nWait for the lock to process the request"
-                )
-            else:
-                print("\nLock command " + result.text)
-    finally:
-        # Stop the subscription listening thread so we can quit
-        controller.stop()
+            set_door_code(device, args.name, args.pin)
 
 
 if __name__ == "__main__":
@@ -1,54 +1,52 @@
-#!/usr/bin/env python
 """Example script."""
 
 # Parse Arguments
-# Import project path
 import argparse
-import os
+import functools
 import sys
+from typing import List, Optional, cast
 
 # Import pyvera
-from pyvera import VeraController, VeraLock
+from pyvera import VeraLock
 
+from ._common import by_class, vera
 
-def main() -> None:
-    """Run main code entrypoint."""
-    sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
 
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser once."""
     parser = argparse.ArgumentParser(description="show-lock-info")
     parser.add_argument(
         "-u", "--url", help="Vera URL, e.g. http://192.168.1.161:3480", required=True
     )
-    args = parser.parse_args()
-
-    # Start the controller
-    controller = VeraController(args.url)
-    controller.start()
-
-    try:
-        # Get a list of all the devices on the vera controller
-        all_devices = controller.get_devices()
-
-        # Look over the list and find the lock devices
-        for device in all_devices:
-            if isinstance(device, VeraLock):
-                print(
-                    "{} {} ({})".format(
-                        type(device).__name__, device.name, device.device_id
-                    )
-                )
-                print("    comm_failure: {}".format(device.comm_failure))
-                print("    room_id: {}".format(device.room_id))
-                print("    is_locked(): {}".format(device.is_locked()))
-                print("    get_pin_failed(): {}".format(device.get_pin_failed()))
-                print("    get_unauth_user(): {}".format(device.get_unauth_user()))
-                print("    get_lock_failed(): {}".format(device.get_lock_failed()))
-                print("    get_last_user(): {}".format(device.get_last_user()))
-                print("    get_pin_codes(): {}".format(device.get_pin_codes()))
-
-    finally:
-        # Stop the subscription listening thread so we can quit
-        controller.stop()
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run main code entrypoint."""
+    args = _build_parser().parse_args(argv)
+
+    # Start the controller, it is stopped again when the block exits
+    with vera(args.url) as (_, all_devices):
+        lock_devices = cast(List[VeraLock], by_class(all_devices)[VeraLock])
+
+        lines: List[str] = []
+        for device in lock_devices:
+            lines += [
+                f"{device.__class__.__name__} {device.name} ({device.device_id})",
+                f"    comm_failure: {device.comm_failure}",
+                f"    room_id: {device.room_id}",
+                f"    is_locked(): {device.is_locked()}",
+                f"    get_pin_failed(): {device.get_pin_failed()}",
+                f"    get_unauth_user(): {device.get_unauth_user()}",
+                f"    get_lock_failed(): {device.get_lock_failed()}",
+                f"    get_last_user(): {device.get_last_user()}",
+                f"    get_pin_codes(): {device.get_pin_codes()}",
+            ]
+
+        # Print everything out with a single write
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
@@ -4,16 +4,41 @@ This lib is designed to simplify communication with Vera controllers
 """
 from abc import ABC, abstractmethod
 import collections
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import functools
 import json
 import logging
 import os
+import re
 import shlex
+import socket
 import threading
 import time
-from typing import Any, Callable, DefaultDict, Dict, List, Optional, Tuple, Union, cast
+from typing import (
+    Any,
+    Callable,
+    DefaultDict,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+try:
+    # orjson parses the large status and long poll answers several times faster
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads  # type: ignore[no-redef]
 
 TIMESTAMP_NONE = {"dataversion": 1, "loadtime": 0}
 
@@ -23,8 +48,23 @@ SUBSCRIPTION_WAIT = 30
 SUBSCRIPTION_MIN_WAIT = 200
 # Timeout for requests calls, as vera sometimes just sits on sockets.
 TIMEOUT = SUBSCRIPTION_WAIT
+# Timeout for connecting to the Vera, a reachable one answers well within this
+CONNECT_TIMEOUT = 3.05
 # VeraLock set target timeout in seconds
 LOCK_TARGET_TIMEOUT_SEC = 30
+# Max number of keep-alive connections kept open to the Vera
+POOL_MAXSIZE = 16
+# Seconds an sdata answer is reused for, so back to back lookups share a fetch
+SDATA_TTL = 1.0
+# TCP keep-alive timers, a silent Vera is given up on after
+# KEEPALIVE_IDLE + KEEPALIVE_INTERVAL * KEEPALIVE_COUNT seconds, within TIMEOUT
+KEEPALIVE_IDLE = 10
+KEEPALIVE_INTERVAL = 5
+KEEPALIVE_COUNT = 3
+# Times to retry a request that could not connect to the Vera
+CONNECT_RETRIES = 3
+# Max number of requests VeraController.run_in_parallel has in flight at once
+PARALLEL_WORKERS = 8
 
 CATEGORY_DIMMER = 2
 CATEGORY_SWITCH = 3
@@ -44,9 +84,29 @@ CATEGORY_VERA_SIREN = 24
 CATEGORY_UV_SENSOR = 28
 CATEGORY_GARAGE_DOOR = 32
 
+# Categories that are all represented by a VeraSensor
+SENSOR_CATEGORIES = frozenset(
+    (
+        CATEGORY_SENSOR,
+        CATEGORY_HUMIDITY_SENSOR,
+        CATEGORY_TEMPERATURE_SENSOR,
+        CATEGORY_LIGHT_SENSOR,
+        CATEGORY_POWER_METER,
+        CATEGORY_UV_SENSOR,
+    )
+)
+
+# Categories that never get a VeraArmableDevice twin, even when armable
+NOT_ARMABLE_CATEGORIES = frozenset(
+    (CATEGORY_SWITCH, CATEGORY_VERA_SIREN, CATEGORY_CURTAIN, CATEGORY_GARAGE_DOOR)
+)
+
 
 # How long to wait before retrying Vera
 SUBSCRIPTION_RETRY = 9
+# Longest wait between retries while the Vera stays unreachable (9, 18, 36, then
+# 60 seconds). Once it is back, updates resume at most about a minute later.
+SUBSCRIPTION_RETRY_MAX = 60
 
 # Vera state codes see http://wiki.micasaverde.com/index.php/Luup_Requests
 STATE_NO_JOB = -1
@@ -86,6 +146,43 @@ init_logging(LOG, os.environ.get("PYVERA_LOGLEVEL"))
 LOG.debug("DEBUG logging is ON")
 
 
+def _keepalive_socket_options() -> List[Tuple[int, int, int]]:
+    """Get the socket options turning on TCP keep-alive.
+
+    The kernel default only starts probing after hours, so the timers are
+    set where the platform allows it (not on Windows, nor TCP_KEEPIDLE on
+    macOS).
+    """
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    for name, value in (
+        ("TCP_KEEPIDLE", KEEPALIVE_IDLE),
+        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+        ("TCP_KEEPCNT", KEEPALIVE_COUNT),
+    ):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+
+    return options
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTP adapter that turns on TCP keep-alive for its connections.
+
+    The Vera can drop off the network while a request waits on it, on a long
+    poll in particular; keep-alive probes notice that well before the read
+    timeout would.
+    """
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        """Init the pool manager, adding the keep-alive socket options."""
+        # Keep urllib3's defaults, which already include TCP_NODELAY
+        kwargs.setdefault(
+            "socket_options",
+            HTTPConnection.default_socket_options + _keepalive_socket_options(),
+        )
+        super().init_poolmanager(*args, **kwargs)
+
+
 # pylint: disable=too-many-instance-attributes
 class VeraController:
     """Class to interact with the Vera device."""
@@ -103,6 +200,8 @@ class VeraController:
         """
 
         self.base_url = base_url
+        # Tolerate a trailing slash on the URL rather than requesting "//data_request"
+        self._request_url = base_url.rstrip("/") + "/data_request"
         self.devices: List[VeraDevice] = []
         self.scenes: List[VeraScene] = []
         self.temperature_units = "C"
@@ -114,39 +213,134 @@ class VeraController:
         self.subscription_registry.set_controller(self)
         self.categories: Dict[int, str] = {}
         self.device_id_map: Dict[int, VeraDevice] = {}
+        # Device wrappers from the last get_devices, by device id and class
+        self._device_wrappers: Dict[Tuple[int, type], VeraDevice] = {}
+        # Devices of the last get_devices by id and by name, for the lookups
+        self._devices_by_id: Dict[int, VeraDevice] = {}
+        self._devices_by_name: Dict[str, VeraDevice] = {}
+
+        # All requests share one session so connections to the Vera are reused
+        # instead of being set up again for every call.
+        self._session = requests.Session()
+        # Every command is a GET, so only retry connecting. A request the Vera
+        # got but didn't answer is never sent again, and times out as before.
+        retries = Retry(
+            total=None, connect=CONNECT_RETRIES, read=False, status=0, other=0
+        )
+        adapter = _KeepAliveAdapter(pool_maxsize=POOL_MAXSIZE, max_retries=retries)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        # The long poll gets its own session, so a request parked on the Vera for
+        # up to TIMEOUT * 2 never holds a connection the other calls need, and
+        # each poll reuses the socket of the one before it.
+        self._poll_session = requests.Session()
+        poll_adapter = _KeepAliveAdapter(pool_maxsize=1, max_retries=retries)
+        self._poll_session.mount("http://", poll_adapter)
+        self._poll_session.mount("https://", poll_adapter)
+
+        # Raw body of the last sdata answer and when it was fetched
+        self._sdata: Optional[Tuple[float, bytes]] = None
+        # Bumped by invalidate_sdata, so a fetch running meanwhile isn't cached
+        self._sdata_generation = 0
+        # Devices of that answer by id, built on demand for device refreshes
+        self._sdata_devices: Optional[
+            Tuple[Tuple[float, bytes], Dict[int, dict]]
+        ] = None
 
     def data_request(self, payload: dict, timeout: int = TIMEOUT) -> requests.Response:
         """Perform a data_request and return the result."""
-        request_url = self.base_url + "/data_request"
-        response = requests.get(request_url, timeout=timeout, params=payload)
+        return self._get(self._session, payload, timeout)
+
+    def _get(
+        self, session: requests.Session, payload: dict, timeout: int
+    ) -> requests.Response:
+        response = session.get(
+            self._request_url, timeout=(CONNECT_TIMEOUT, timeout), params=payload
+        )
         response.encoding = response.encoding if response.encoding else "utf-8"
         return response
 
-    def get_simple_devices_info(self) -> None:
-        """Get basic device info from Vera."""
-        j = self.data_request({"id": "sdata"}).json()
+    def _fetch_sdata(self) -> Tuple[float, bytes]:
+        cached = self._sdata
+        now = time.monotonic()
+        if cached is None or now - cached[0] >= SDATA_TTL:
+            generation = self._sdata_generation
+            cached = (now, self.data_request({"id": "sdata"}).content)
+            # Don't cache an answer that may predate an invalidate_sdata call
+            # made while it was in flight
+            if generation == self._sdata_generation:
+                self._sdata = cached
+
+        return cached
+
+    def get_sdata(self) -> dict:
+        """Get the sdata summary, reusing an answer fetched within SDATA_TTL."""
+        # Parse on every call so callers never share (and mutate) the same dicts
+        return cast(dict, json_loads(self._fetch_sdata()[1]))
+
+    def get_sdata_device(self, device_id: int) -> Optional[dict]:
+        """Get the sdata entry of a single device.
+
+        The entries are indexed once per sdata answer and shared between
+        callers, so refreshing many devices costs one fetch. Treat them as
+        read only.
+        """
+        cached = self._fetch_sdata()
+        index = self._sdata_devices
+        if index is None or index[0] is not cached:
+            devices = json_loads(cached[1]).get("devices") or ()
+            index = (cached, {dev.get("id"): dev for dev in devices})
+            self._sdata_devices = index
+
+        return index[1].get(device_id)
+
+    def invalidate_sdata(self) -> None:
+        """Drop the cached sdata answer after changing state on the Vera."""
+        self._sdata_generation += 1
+        self._sdata = None
+
+    def run_in_parallel(self, calls: Iterable[Callable[[], Any]]) -> List[Any]:
+        """Run independent device calls concurrently and return their results.
+
+        Each call is typically a bound method such as switch.switch_on. They
+        share the pooled session, so N commands take about N / PARALLEL_WORKERS
+        round trips instead of N. A failing call doesn't stop the others, they
+        all still run; the exception of the earliest failing call, in input
+        order, is then re-raised.
+        """
+        calls = list(calls)
+        if not calls:
+            return []
 
-        self.scenes = []
-        items = j.get("scenes")
+        with ThreadPoolExecutor(
+            max_workers=min(PARALLEL_WORKERS, len(calls)),
+            thread_name_prefix="Vera Request",
+        ) as pool:
+            return list(pool.map(lambda call: call(), calls))
 
-        for item in items:
-            self.scenes.append(VeraScene(item, self))
+    def get_simple_devices_info(self) -> None:
+        """Get basic device info from Vera."""
+        j = self.get_sdata()
 
-        if j.get("temperature"):
-            self.temperature_units = j.get("temperature")
+        self.scenes = [VeraScene(item, self) for item in j.get("scenes")]
 
-        self.categories = {}
-        cats = j.get("categories")
+        temperature_units = j.get("temperature")
+        if temperature_units:
+            self.temperature_units = temperature_units
 
-        for cat in cats:
-            self.categories[cat.get("id")] = cat.get("name")
+        self.categories, self.device_id_map = self._parse_sdata_devices(j)
 
-        self.device_id_map = {}
+    @staticmethod
+    def _parse_sdata_devices(j: dict) -> Tuple[Dict[int, str], Dict[int, Any]]:
+        """Get the category names and the devices by id from an sdata answer."""
+        categories = {cat.get("id"): cat.get("name") for cat in j.get("categories")}
 
+        category_name = categories.get
         devs = j.get("devices")
         for dev in devs:
-            dev["categoryName"] = self.categories.get(dev.get("category"))
-            self.device_id_map[dev.get("id")] = dev
+            dev["categoryName"] = category_name(dev.get("category"))
+
+        return categories, {dev.get("id"): dev for dev in devs}
 
     def get_scenes(self) -> List["VeraScene"]:
         """Get list of scenes."""
@@ -159,15 +353,17 @@ class VeraController:
         """Search the list of connected devices by name.
 
         device_name param is the string name of the device
-        """
 
-        # Find the device for the vera device name we are interested in
-        found_device = None
-        for device in self.get_devices():
-            if device.name == device_name:
-                found_device = device
-                # found the first (and should be only) one so we will finish
-                break
+        Devices already fetched by get_devices are looked up without asking
+        the Vera again. Only an unknown name fetches the devices, in case it
+        was added since.
+        """
+        # The first (and should be only) device with that name. Also fetch
+        # again if it was renamed since it was indexed.
+        found_device = self._devices_by_name.get(device_name)
+        if found_device is None or found_device.name != device_name:
+            self.get_devices()
+            found_device = self._devices_by_name.get(device_name)
 
         if found_device is None:
             LOG.debug("Did not find device with %s", device_name)
@@ -178,96 +374,122 @@ class VeraController:
         """Search the list of connected devices by ID.
 
         device_id param is the integer ID of the device
-        """
 
-        # Find the device for the vera device name we are interested in
-        found_device = None
-        for device in self.get_devices():
-            if device.device_id == device_id:
-                found_device = device
-                # found the first (and should be only) one so we will finish
-                break
+        Devices already fetched by get_devices are looked up without asking
+        the Vera again. Only an unknown id fetches the devices, in case it
+        was added since.
+        """
+        found_device = self._devices_by_id.get(device_id)
+        if found_device is None:
+            self.get_devices()
+            found_device = self._devices_by_id.get(device_id)
 
         if found_device is None:
             LOG.debug("Did not find device with %s", device_id)
 
         return found_device
 
-    def get_devices(self, category_filter: str = "") -> List["VeraDevice"]:
+    def get_devices(
+        self, category_filter: Union[str, Iterable[str]] = ""
+    ) -> List["VeraDevice"]:
         """Get list of connected devices.
 
         category_filter param is an array of strings.  If specified, this
         function will only return devices with category names which match the
         strings in this filter.
         """
+        # Look the names up in a set rather than scanning the filter per device.
+        # A plain string is left alone so it keeps matching as a substring.
+        if category_filter and not isinstance(category_filter, str):
+            category_filter = frozenset(category_filter)
 
         # the Vera rest API is a bit rough so we need to make 2 calls to get
         # all the info we need
-        self.get_simple_devices_info()
-
-        json_data = self.data_request({"id": "status", "output_format": "json"}).json()
+        json_data = self._get_status()
 
         self.devices = []
+        # Keep the wrappers of devices that are still there, so that objects
+        # held (and registered for updates) by callers stay current.
+        wrappers = self._device_wrappers
+        self._device_wrappers = {}
         items = json_data.get("devices")
-        alerts = json_data.get("alerts", ())
+
+        # Group the alerts up front rather than scanning all of them per device
+        alerts: DefaultDict[Any, List[dict]] = collections.defaultdict(list)
+        for alert in json_data.get("alerts", ()):
+            alerts[alert.get("PK_Device")].append(alert)
 
         for item in items:
-            item["deviceInfo"] = self.device_id_map.get(item.get("id")) or {}
-            item_alerts = [
-                alert for alert in alerts if alert.get("PK_Device") == item.get("id")
-            ]
-            device_category = item.get("deviceInfo", {}).get("category")
-
-            device: VeraDevice
-            if device_category == CATEGORY_DIMMER:
-                device = VeraDimmer(item, item_alerts, self)
-            elif device_category in (CATEGORY_SWITCH, CATEGORY_VERA_SIREN):
-                device = VeraSwitch(item, item_alerts, self)
-            elif device_category == CATEGORY_THERMOSTAT:
-                device = VeraThermostat(item, item_alerts, self)
-            elif device_category == CATEGORY_LOCK:
-                device = VeraLock(item, item_alerts, self)
-            elif device_category == CATEGORY_CURTAIN:
-                device = VeraCurtain(item, item_alerts, self)
-            elif device_category == CATEGORY_ARMABLE:
-                device = VeraBinarySensor(item, item_alerts, self)
-            elif device_category in (
-                CATEGORY_SENSOR,
-                CATEGORY_HUMIDITY_SENSOR,
-                CATEGORY_TEMPERATURE_SENSOR,
-                CATEGORY_LIGHT_SENSOR,
-                CATEGORY_POWER_METER,
-                CATEGORY_UV_SENSOR,
-            ):
-                device = VeraSensor(item, item_alerts, self)
-            elif device_category in (CATEGORY_SCENE_CONTROLLER, CATEGORY_REMOTE):
-                device = VeraSceneController(item, item_alerts, self)
-            elif device_category == CATEGORY_GARAGE_DOOR:
-                device = VeraGarageDoor(item, item_alerts, self)
-            else:
-                device = VeraDevice(item, item_alerts, self)
+            device_id = item.get("id")
+            device_info = self.device_id_map.get(device_id) or {}
+            item["deviceInfo"] = device_info
+            item_alerts = alerts.get(device_id, [])
+            device_category = device_info.get("category")
+
+            device_class = CATEGORY_DEVICE_CLASSES.get(device_category, VeraDevice)
+            device = self._reuse_device(wrappers, device_class, item, item_alerts)
 
             self.devices.append(device)
 
-            if device.is_armable and device_category not in (
-                CATEGORY_SWITCH,
-                CATEGORY_VERA_SIREN,
-                CATEGORY_CURTAIN,
-                CATEGORY_GARAGE_DOOR,
-            ):
-                self.devices.append(VeraArmableDevice(item, item_alerts, self))
+            if device_category not in NOT_ARMABLE_CATEGORIES and device.is_armable:
+                self.devices.append(
+                    self._reuse_device(wrappers, VeraArmableDevice, item, item_alerts)
+                )
+
+        self._index_devices()
+
+        if not category_filter:
+            return list(self.devices)
 
         return [
             device
             for device in self.devices
-            if not category_filter
-            or (
-                device.category_name is not None
-                and device.category_name != ""
-                and device.category_name in category_filter
-            )
+            if device.category_name and device.category_name in category_filter
         ]
 
+    def _get_status(self) -> dict:
+        """Get the full status, refreshing the basic device info alongside it.
+
+        The two requests don't depend on each other, so the sdata one runs on a
+        worker thread while this one waits on the status.
+        """
+        with ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="Vera Request"
+        ) as pool:
+            simple_devices_info = pool.submit(self.get_simple_devices_info)
+            response = self.data_request({"id": "status", "output_format": "json"})
+            simple_devices_info.result()
+
+        return cast(dict, json_loads(response.content))
+
+    def _index_devices(self) -> None:
+        """Index the devices by id and name, the first one wins like a scan."""
+        by_id: Dict[int, VeraDevice] = {}
+        by_name: Dict[str, VeraDevice] = {}
+        for device in self.devices:
+            by_id.setdefault(device.device_id, device)
+            by_name.setdefault(device.name, device)
+
+        self._devices_by_id = by_id
+        self._devices_by_name = by_name
+
+    def _reuse_device(
+        self,
+        wrappers: Dict[Tuple[int, type], "VeraDevice"],
+        device_class: Type["VeraDevice"],
+        item: dict,
+        item_alerts: List[dict],
+    ) -> "VeraDevice":
+        key = (item.get("id"), device_class)
+        device = wrappers.get(key)
+        if device is None:
+            device = device_class(item, item_alerts, self)
+        else:
+            device._load(item, item_alerts)  # pylint: disable=protected-access
+
+        self._device_wrappers[key] = device
+        return device
+
     def refresh_data(self) -> Dict[int, "VeraDevice"]:
         """Refresh mapping from device ids to devices."""
         # Note: This function is side-effect free and appears to be unused.
@@ -275,35 +497,21 @@ class VeraController:
 
         # the Vera rest API is a bit rough so we need to make 2 calls
         # to get all the info e need
-        j = self.data_request({"id": "sdata"}).json()
+        j = self.get_sdata()
 
         self.temperature_units = j.get("temperature", "C")
         self.model = j.get("model")
         self.version = j.get("version")
         self.serial_number = j.get("serial_number")
 
-        categories = {}
-        cats = j.get("categories")
-
-        for cat in cats:
-            categories[cat.get("id")] = cat.get("name")
-
-        device_id_map = {}
-
-        devs = j.get("devices")
-        for dev in devs:
-            dev["categoryName"] = categories.get(dev.get("category"))
-            device_id_map[dev.get("id")] = dev
-
+        _, device_id_map = self._parse_sdata_devices(j)
         return device_id_map
 
     def map_services(self) -> None:
         """Get full Vera device service info."""
         # Note: This function updates the device_services_map, but that map does
         # not appear to be used.  Safe to erase?
-        self.get_simple_devices_info()
-
-        j = self.data_request({"id": "status", "output_format": "json"}).json()
+        j = self._get_status()
 
         service_map = {}
 
@@ -331,23 +539,26 @@ class VeraController:
         payload.update(timestamp)
 
         # double the timeout here so requests doesn't timeout before vera
-        LOG.debug("get_changed_devices() requesting payload %s", str(payload))
-        response = self.data_request(payload, TIMEOUT * 2)
+        LOG.debug("get_changed_devices() requesting payload %s", payload)
+        response = self._get(self._poll_session, payload, TIMEOUT * 2)
         response.raise_for_status()
 
         # If the Vera disconnects before writing a full response (as lu_sdata
         # will do when interrupted by a Luup reload), the requests module will
         # happily return 200 with an empty string. So, test for empty response,
         # so we don't rely on the JSON parser to throw an exception.
-        if response.text == "":
+        if not response.content:
             raise PyveraError("Empty response from Vera")
 
         # Catch a wide swath of what the JSON parser might throw, within
         # reason. Unfortunately, some parsers don't specifically return
         # json.decode.JSONDecodeError, but so far most seem to derive what
         # they do throw from ValueError, so that's helpful.
+        #
+        # Parse the raw bytes directly rather than decoding the whole body into
+        # a str first, the long poll can return a lot of changed devices.
         try:
-            result = response.json()
+            result = json_loads(response.content)
         except ValueError as ex:
             raise PyveraError("JSON decode error: " + str(ex))
 
@@ -382,15 +593,16 @@ class VeraController:
             "id": "status",
         }
 
-        LOG.debug("get_alerts() requesting payload %s", str(payload))
+        LOG.debug("get_alerts() requesting payload %s", payload)
         response = self.data_request(payload)
         response.raise_for_status()
 
-        if response.text == "":
+        # Check the raw bytes, decoding the body just to compare it is wasted
+        if not response.content:
             raise PyveraError("Empty response from Vera")
 
         try:
-            result = response.json()
+            result = json_loads(response.content)
         except ValueError as ex:
             raise PyveraError("JSON decode error: " + str(ex))
 
@@ -425,8 +637,17 @@ class VeraController:
         self.subscription_registry.start()
 
     def stop(self) -> None:
-        """Stop the subscription thread."""
+        """Stop the subscription thread and close any pooled connections."""
         self.subscription_registry.stop()
+        self.close()
+
+    def close(self) -> None:
+        """Close the pooled connections to the Vera.
+
+        The controller stays usable, later requests open new connections.
+        """
+        self._session.close()
+        self._poll_session.close()
 
     def register(self, device: "VeraDevice", callback: SubscriptionCallback) -> None:
         """Register a device and callback with the subscription service.
@@ -445,22 +666,47 @@ class VeraController:
 class VeraDevice:
     """Class to represent each vera device."""
 
+    # Fixed attribute set, there can be a lot of devices (plus armable twins)
+    __slots__ = (
+        # Nothing in pyvera weakly references devices, but code using it may
+        "__weakref__",
+        "_dev_info",
+        "_states",
+        "alerts",
+        "category",
+        "category_name",
+        "device_id",
+        "json_state",
+        "name",
+        "vera_controller",
+    )
+
     def __init__(
         self, json_obj: dict, json_alerts: List[dict], vera_controller: VeraController
     ):
         """Init object."""
+        self.vera_controller = vera_controller
+        self.alerts: List[VeraAlert] = []
+        self._load(json_obj, json_alerts)
+
+    def _load(self, json_obj: dict, json_alerts: List[dict]) -> None:
+        """Take on the state from a status answer of the Vera."""
+        # pylint: disable=attribute-defined-outside-init
         self.json_state = json_obj
         self.device_id = self.json_state.get("id")
-        self.vera_controller = vera_controller
         self.name = ""
-        self.alerts: List[VeraAlert] = []
         self.set_alerts(json_alerts)
-
-        if self.json_state.get("deviceInfo"):
-            device_info = self.json_state.get("deviceInfo", {})
-            self.category = device_info.get("category")
-            self.category_name = device_info.get("categoryName")
-            self.name = device_info.get("name")
+        # The deviceInfo dict is only ever updated in place, so look it up once
+        # for the value getters and setters below.
+        self._dev_info: dict = self.json_state.get("deviceInfo", {})
+        # Service states by variable name, indexed on first use as most devices
+        # never have a complex value read.
+        self._states: Optional[Dict[str, List[dict]]] = None
+
+        if self._dev_info:
+            self.category = self._dev_info.get("category")
+            self.category_name = self._dev_info.get("categoryName")
+            self.name = self._dev_info.get("name")
         else:
             self.category_name = ""
 
@@ -474,70 +720,39 @@ class VeraDevice:
         """Get a string representation."""
         return f"{self.__class__.__name__} (id={self.device_id} category={self.category_name} name={self.name})"
 
-    @property
-    def switch_service(self) -> str:
-        """Vera service string for switch."""
-        return "urn:upnp-org:serviceId:SwitchPower1"
-
-    @property
-    def dimmer_service(self) -> str:
-        """Vera service string for dimmer."""
-        return "urn:upnp-org:serviceId:Dimming1"
-
-    @property
-    def security_sensor_service(self) -> str:
-        """Vera service string for armable sensors."""
-        return "urn:micasaverde-com:serviceId:SecuritySensor1"
-
-    @property
-    def window_covering_service(self) -> str:
-        """Vera service string for window covering service."""
-        return "urn:upnp-org:serviceId:WindowCovering1"
-
-    @property
-    def lock_service(self) -> str:
-        """Vera service string for lock service."""
-        return "urn:micasaverde-com:serviceId:DoorLock1"
-
-    @property
-    def thermostat_operating_service(self) -> Tuple[str]:
-        """Vera service string HVAC operating mode."""
-        return ("urn:upnp-org:serviceId:HVAC_UserOperatingMode1",)
-
-    @property
-    def thermostat_fan_service(self) -> str:
-        """Vera service string HVAC fan operating mode."""
-        return "urn:upnp-org:serviceId:HVAC_FanOperatingMode1"
-
-    @property
-    def thermostat_cool_setpoint(self) -> str:
-        """Vera service string Temperature Setpoint1 Cool."""
-        return "urn:upnp-org:serviceId:TemperatureSetpoint1_Cool"
-
-    @property
-    def thermostat_heat_setpoint(self) -> str:
-        """Vera service string Temperature Setpoint Heat."""
-        return "urn:upnp-org:serviceId:TemperatureSetpoint1_Heat"
-
-    @property
-    def thermostat_setpoint(self) -> str:
-        """Vera service string Temperature Setpoint."""
-        return "urn:upnp-org:serviceId:TemperatureSetpoint1"
-
-    @property
-    def color_service(self) -> str:
-        """Vera service string for color."""
-        return "urn:micasaverde-com:serviceId:Color1"
-
-    @property
-    def poll_service(self) -> str:
-        """Vera service string for poll."""
-        return "urn:micasaverde-com:serviceId:HaDevice1"
+    # Service ids are constants, so plain class attributes rather than properties
+    # Vera service string for switch
+    switch_service = "urn:upnp-org:serviceId:SwitchPower1"
+    # Vera service string for dimmer
+    dimmer_service = "urn:upnp-org:serviceId:Dimming1"
+    # Vera service string for armable sensors
+    security_sensor_service = "urn:micasaverde-com:serviceId:SecuritySensor1"
+    # Vera service string for window covering service
+    window_covering_service = "urn:upnp-org:serviceId:WindowCovering1"
+    # Vera service string for lock service
+    lock_service = "urn:micasaverde-com:serviceId:DoorLock1"
+    # Vera service string HVAC operating mode
+    thermostat_operating_service = "urn:upnp-org:serviceId:HVAC_UserOperatingMode1"
+    # Vera service string HVAC fan operating mode
+    thermostat_fan_service = "urn:upnp-org:serviceId:HVAC_FanOperatingMode1"
+    # Vera service string Temperature Setpoint1 Cool
+    thermostat_cool_setpoint = "urn:upnp-org:serviceId:TemperatureSetpoint1_Cool"
+    # Vera service string Temperature Setpoint Heat
+    thermostat_heat_setpoint = "urn:upnp-org:serviceId:TemperatureSetpoint1_Heat"
+    # Vera service string Temperature Setpoint
+    thermostat_setpoint = "urn:upnp-org:serviceId:TemperatureSetpoint1"
+    # Vera service string for color
+    color_service = "urn:micasaverde-com:serviceId:Color1"
+    # Vera service string for poll
+    poll_service = "urn:micasaverde-com:serviceId:HaDevice1"
 
     def vera_request(self, **kwargs: Any) -> requests.Response:
         """Perfom a vera_request for this device."""
-        request_payload = {"output_format": "json", "DeviceNum": self.device_id}
-        request_payload.update(kwargs)
+        request_payload = {
+            "output_format": "json",
+            "DeviceNum": self.device_id,
+            **kwargs,
+        }
 
         return self.vera_controller.data_request(request_payload)
 
@@ -559,11 +774,14 @@ class VeraDevice:
             parameter_name: value,
         }
         result = self.vera_request(**payload)
-        LOG.debug(
-            "set_service_value: " "result of vera_request with payload %s: %s",
-            payload,
-            result.text,
-        )
+        self.vera_controller.invalidate_sdata()
+        # result.text decodes the whole body, only do that when it gets logged
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug(
+                "set_service_value: " "result of vera_request with payload %s: %s",
+                payload,
+                result.text,
+            )
 
     def set_door_code_values(
         self, service_id: Union[str, Tuple[str, ...]], operation: str, parameter: dict
@@ -572,15 +790,20 @@ class VeraDevice:
 
         This will call the Vera api to change Lock code.
         """
-        payload = {"id": "lu_action", "action": operation, "serviceId": service_id}
-        for param in parameter:
-            payload[param] = parameter[param]
+        payload = {
+            "id": "lu_action",
+            "action": operation,
+            "serviceId": service_id,
+            **parameter,
+        }
         result = self.vera_request(**payload)
-        LOG.debug(
-            "set_door_code_values: " "result of vera_request with payload %s: %s",
-            payload,
-            result.text,
-        )
+        self.vera_controller.invalidate_sdata()
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug(
+                "set_door_code_values: " "result of vera_request with payload %s: %s",
+                payload,
+                result.text,
+            )
         return result
 
     def call_service(self, service_id: str, action: str) -> requests.Response:
@@ -589,12 +812,14 @@ class VeraDevice:
         This will call the Vera api to change device state.
         """
         result = self.vera_request(id="action", serviceId=service_id, action=action)
-        LOG.debug(
-            "call_service: " "result of vera_request for %s with id %s: %s",
-            self.name,
-            service_id,
-            result.text,
-        )
+        self.vera_controller.invalidate_sdata()
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug(
+                "call_service: " "result of vera_request for %s with id %s: %s",
+                self.name,
+                service_id,
+                result.text,
+            )
         return result
 
     def poll_device(self) -> None:
@@ -608,13 +833,28 @@ class VeraDevice:
         device state to refect a new value which has not yet updated from
         Vera.
         """
-        dev_info = self.json_state.get("deviceInfo", {})
+        dev_info = self._dev_info
         if dev_info.get(name.lower()) is None:
             LOG.error("Could not set %s for %s (key does not exist).", name, self.name)
             LOG.error("- dictionary %s", dev_info)
             return
         dev_info[name.lower()] = str(value)
 
+    def _states_map(self) -> Dict[str, List[dict]]:
+        """Get the service states indexed by variable name.
+
+        A variable can show up under more than one service, so every entry is
+        kept in its original order.
+        """
+        states = self._states
+        if states is None:
+            states = {}
+            for item in self.json_state.get("states") or ():
+                states.setdefault(item.get("variable"), []).append(item)
+            self._states = states  # pylint: disable=attribute-defined-outside-init
+
+        return states
+
     def set_cache_complex_value(self, name: str, value: Any) -> None:
         """Set a variable in the local complex state dictionary.
 
@@ -622,9 +862,8 @@ class VeraDevice:
         device state to refect a new value which has not yet updated from
         Vera.
         """
-        for item in self.json_state.get("states", []):
-            if item.get("variable") == name:
-                item["value"] = str(value)
+        for item in self._states_map().get(name, ()):
+            item["value"] = str(value)
 
     def get_complex_value(self, name: str) -> Any:
         """Get a value from the service dictionaries.
@@ -632,10 +871,8 @@ class VeraDevice:
         It's best to use get_value if it has the data you require since
         the vera subscription only updates data in dev_info.
         """
-        for item in self.json_state.get("states", []):
-            if item.get("variable") == name:
-                return item.get("value")
-        return None
+        items = self._states_map().get(name)
+        return items[0].get("value") if items else None
 
     def get_all_values(self) -> dict:
         """Get all values from the deviceInfo area.
@@ -652,33 +889,43 @@ class VeraDevice:
 
         This data is updated by the subscription service.
         """
-        return self.get_strict_value(name.lower())
+        return self._dev_info.get(name.lower())
 
     def get_strict_value(self, name: str) -> Any:
-        """Get a case-sensitive keys value from the dev_info area."""
-        dev_info = self.json_state.get("deviceInfo", {})
-        return dev_info.get(name, None)
+        """Get a case-sensitive keys value from the dev_info area.
+
+        Used internally with lower case names, which is what get_value looks
+        up anyway, to skip its lower() on every read.
+        """
+        return self._dev_info.get(name)
 
     def refresh_complex_value(self, name: str) -> Any:
         """Refresh a value from the service dictionaries.
 
         It's best to use get_value / refresh if it has the data you need.
         """
-        for item in self.json_state.get("states", []):
-            if item.get("variable") == name:
-                service_id = item.get("service")
-                result = self.vera_request(
-                    **{
-                        "id": "variableget",
-                        "output_format": "json",
-                        "DeviceNum": self.device_id,
-                        "serviceId": service_id,
-                        "Variable": name,
-                    }
-                )
-                item["value"] = result.text
-                return item.get("value")
-        return None
+        items = self._states_map().get(name)
+        if not items:
+            return None
+
+        item = items[0]
+        result = self.vera_request(
+            id="variableget", serviceId=item.get("service"), Variable=name
+        )
+        item["value"] = result.text
+        return item.get("value")
+
+    def refresh_complex_values(self, names: Iterable[str]) -> List[Any]:
+        """Refresh several values from the service dictionaries.
+
+        The Vera only returns one variable per variableget, so the requests go
+        out concurrently and cost about one round trip together.
+        """
+        # Index the states up front rather than racing to do it in the workers
+        self._states_map()
+        return self.vera_controller.run_in_parallel(
+            functools.partial(self.refresh_complex_value, name) for name in names
+        )
 
     def set_alerts(self, json_alerts: List[dict]) -> None:
         """Convert JSON alert data to VeraAlerts."""
@@ -693,29 +940,28 @@ class VeraDevice:
 
         Only needed if you're not using subscriptions.
         """
-        j = self.vera_request(id="sdata", output_format="json").json()
-        devices = j.get("devices")
-        for device_data in devices:
-            if device_data.get("id") == self.device_id:
-                self.update(device_data)
+        device_data = self.vera_controller.get_sdata_device(self.device_id)
+        if device_data is not None:
+            self.update(device_data)
 
     def update(self, params: dict) -> None:
         """Update the dev_info data from a dictionary.
 
         Only updates if it already exists in the device.
         """
-        dev_info = self.json_state.get("deviceInfo", {})
-        dev_info.update({k: params[k] for k in params if dev_info.get(k)})
+        dev_info = self._dev_info
+        for key in dev_info.keys() & params.keys():
+            dev_info[key] = params[key]
 
     @property
     def is_armable(self) -> bool:
         """Device is armable."""
-        return self.get_value("Armed") is not None
+        return self.get_strict_value("armed") is not None
 
     @property
     def is_armed(self) -> bool:
         """Device is armed now."""
-        return cast(str, self.get_value("Armed")) == "1"
+        return cast(str, self.get_strict_value("armed")) == "1"
 
     @property
     def is_dimmable(self) -> bool:
@@ -725,48 +971,48 @@ class VeraDevice:
     @property
     def is_trippable(self) -> bool:
         """Device is trippable."""
-        return self.get_value("Tripped") is not None
+        return self.get_strict_value("tripped") is not None
 
     @property
     def is_tripped(self) -> bool:
         """Device is tripped now."""
-        return cast(str, self.get_value("Tripped")) == "1"
+        return cast(str, self.get_strict_value("tripped")) == "1"
 
     @property
     def has_battery(self) -> bool:
         """Device has a battery."""
-        return self.get_value("BatteryLevel") is not None
+        return self.get_strict_value("batterylevel") is not None
 
     @property
     def battery_level(self) -> int:
         """Battery level as a percentage."""
-        return cast(int, self.get_value("BatteryLevel"))
+        return cast(int, self.get_strict_value("batterylevel"))
 
     @property
     def last_trip(self) -> str:
         """Time device last tripped."""
         # Vera seems not to update this for my device!
-        return cast(str, self.get_value("LastTrip"))
+        return cast(str, self.get_strict_value("lasttrip"))
 
     @property
     def light(self) -> int:
         """Light level in lux."""
-        return cast(int, self.get_value("Light"))
+        return cast(int, self.get_strict_value("light"))
 
     @property
     def level(self) -> int:
         """Get level from vera."""
         # Used for dimmers, curtains
         # Have seen formats of 10, 0.0 and "0%"!
-        level = self.get_value("level")
-        try:
-            return int(float(level))
-        except (TypeError, ValueError):
-            pass
-        try:
-            return int(level.strip("%"))
-        except (TypeError, AttributeError, ValueError):
-            pass
+        level = self.get_strict_value("level")
+        # Dispatch on the type instead of letting None and "0%" raise first
+        if isinstance(level, str):
+            level = level.strip().strip("%")
+        if isinstance(level, (str, int, float)):
+            try:
+                return int(float(level))
+            except (ValueError, OverflowError):
+                pass
         return 0
 
     @property
@@ -775,27 +1021,27 @@ class VeraDevice:
 
         You can get units from the controller.
         """
-        return cast(float, self.get_value("Temperature"))
+        return cast(float, self.get_strict_value("temperature"))
 
     @property
     def humidity(self) -> float:
         """Get the humidity level in percent."""
-        return cast(float, self.get_value("Humidity"))
+        return cast(float, self.get_strict_value("humidity"))
 
     @property
     def power(self) -> int:
         """Get the current power useage in watts."""
-        return cast(int, self.get_value("Watts"))
+        return cast(int, self.get_strict_value("watts"))
 
     @property
     def energy(self) -> int:
         """Get the energy usage in kwh."""
-        return cast(int, self.get_value("kwh"))
+        return cast(int, self.get_strict_value("kwh"))
 
     @property
     def room_id(self) -> int:
         """Get the Vera Room ID."""
-        return cast(int, self.get_value("room"))
+        return cast(int, self.get_strict_value("room"))
 
     @property
     def comm_failure(self) -> bool:
@@ -819,6 +1065,8 @@ class VeraDevice:
 class VeraSwitch(VeraDevice):
     """Class to add switch functionality."""
 
+    __slots__ = ()
+
     def set_switch_state(self, state: int) -> None:
         """Set the switch state, also update local state."""
         self.set_service_value(self.switch_service, "Target", "newTargetValue", state)
@@ -840,13 +1088,27 @@ class VeraSwitch(VeraDevice):
         """
         if refresh:
             self.refresh()
-        val = self.get_value("Status")
+        val = self.get_strict_value("status")
         return cast(str, val) == "1"
 
 
 class VeraDimmer(VeraSwitch):
     """Class to add dimmer functionality."""
 
+    __slots__ = ("_color_index",)
+
+    def __init__(
+        self, json_obj: dict, json_alerts: List[dict], vera_controller: VeraController
+    ):
+        """Init object."""
+        # SupportedColors string and the position of each color in it
+        self._color_index: Optional[Tuple[str, Dict[str, int]]] = None
+        super().__init__(json_obj, json_alerts, vera_controller)
+
+    # HA brightness for every Vera level percentage, precomputed with the same
+    # rounding (float quirks included) the conversion has always used
+    _BRIGHTNESS_BY_PERCENT = tuple(round(percent * 2.55) for percent in range(101))
+
     def get_brightness(self, refresh: bool = False) -> int:
         """Get dimmer brightness.
 
@@ -857,11 +1119,12 @@ class VeraDimmer(VeraSwitch):
         """
         if refresh:
             self.refresh()
-        brightness = 0
         percent = self.level
-        if percent > 0:
-            brightness = round(percent * 2.55)
-        return int(brightness)
+        if percent <= 0:
+            return 0
+        if percent <= 100:
+            return self._BRIGHTNESS_BY_PERCENT[percent]
+        return int(round(percent * 2.55))
 
     def set_brightness(self, brightness: int) -> None:
         """Set dimmer brightness.
@@ -871,7 +1134,8 @@ class VeraDimmer(VeraSwitch):
         """
         percent = 0
         if brightness > 0:
-            percent = round(brightness / 2.55)
+            # Integer equivalent of round(brightness / 2.55)
+            percent = int((brightness * 100 + 127) // 255)
 
         self.set_service_value(
             self.dimmer_service, "LoadLevelTarget", "newLoadlevelTarget", percent
@@ -892,11 +1156,21 @@ class VeraDimmer(VeraSwitch):
         if sup is None:
             return None
 
-        sup = sup.split(",")
-        if not set(colors).issubset(sup):
-            return None
+        # Position of each supported color, the first one wins like list.index.
+        # Only parsed again when the supported colors change.
+        cached = self._color_index
+        if cached is not None and cached[0] == sup:
+            index = cached[1]
+        else:
+            index = {}
+            for i, color in enumerate(sup.split(",")):
+                index.setdefault(color, i)
+            self._color_index = (sup, index)
 
-        return [sup.index(c) for c in colors]
+        try:
+            return [index[c] for c in colors]
+        except KeyError:
+            return None
 
     def get_color(self, refresh: bool = False) -> Optional[List[int]]:
         """Get color.
@@ -904,23 +1178,23 @@ class VeraDimmer(VeraSwitch):
         Refresh data from Vera if refresh is True, otherwise use local cache.
         """
         if refresh:
-            self.refresh_complex_value("CurrentColor")
+            self.refresh_complex_values(("CurrentColor", "SupportedColors"))
 
-        color_index = self.get_color_index(["R", "G", "B"], refresh)
+        color_index = self.get_color_index(["R", "G", "B"])
         cur = self.get_complex_value("CurrentColor")
         if color_index is None or cur is None:
             return None
 
         try:
-            val = [cur.split(",")[c] for c in color_index]
-            return [int(v.split("=")[1]) for v in val]
+            channels = cur.split(",")
+            return [int(channels[c].split("=")[1]) for c in color_index]
         except IndexError:
             return None
 
     def set_color(self, rgb: List[int]) -> None:
         """Set dimmer color."""
 
-        target = ",".join([str(c) for c in rgb])
+        target = ",".join(map(str, rgb))
         self.set_service_value(
             self.color_service, "ColorRGB", "newColorRGBTarget", target
         )
@@ -929,26 +1203,15 @@ class VeraDimmer(VeraSwitch):
         if rgbi is None:
             return
 
-        target = (
-            "0=0,1=0,"
-            + str(rgbi[0])
-            + "="
-            + str(rgb[0])
-            + ","
-            + str(rgbi[1])
-            + "="
-            + str(rgb[1])
-            + ","
-            + str(rgbi[2])
-            + "="
-            + str(rgb[2])
-        )
+        target = f"0=0,1=0,{rgbi[0]}={rgb[0]},{rgbi[1]}={rgb[1]},{rgbi[2]}={rgb[2]}"
         self.set_cache_complex_value("CurrentColor", target)
 
 
 class VeraArmableDevice(VeraSwitch):
     """Class to represent a device that can be armed."""
 
+    __slots__ = ()
+
     def set_armed_state(self, state: int) -> None:
         """Set the armed state, also update local state."""
         self.set_service_value(
@@ -972,17 +1235,21 @@ class VeraArmableDevice(VeraSwitch):
         """
         if refresh:
             self.refresh()
-        val = self.get_value("Armed")
+        val = self.get_strict_value("armed")
         return cast(str, val) == "1"
 
 
 class VeraSensor(VeraDevice):
     """Class to represent a supported sensor."""
 
+    __slots__ = ()
+
 
 class VeraBinarySensor(VeraDevice):
     """Class to represent an on / off sensor."""
 
+    __slots__ = ()
+
     def is_switched_on(self, refresh: bool = False) -> bool:
         """Get sensor on off state.
 
@@ -991,13 +1258,15 @@ class VeraBinarySensor(VeraDevice):
         """
         if refresh:
             self.refresh()
-        val = self.get_value("Status")
+        val = self.get_strict_value("status")
         return cast(str, val) == "1"
 
 
 class VeraCurtain(VeraSwitch):
     """Class to add curtains functionality."""
 
+    __slots__ = ()
+
     def open(self) -> None:
         """Open the curtains."""
         self.set_level(100)
@@ -1047,9 +1316,20 @@ class VeraCurtain(VeraSwitch):
 class VeraLock(VeraDevice):
     """Class to represent a door lock."""
 
-    # target locked (state, time)
-    # this is used since sdata does not return proper job status for locks
-    lock_target = None
+    __slots__ = ("lock_target",)
+
+    # Plain quoted user code strings, _parse_usercode leaves anything with
+    # escapes, = or unquoted values to shlex
+    _USER_CODE_RE = re.compile(r'\s*UserID="([^"\\=]*)"\s+UserName="([^"\\=]*)"\s*')
+
+    def __init__(
+        self, json_obj: dict, json_alerts: List[dict], vera_controller: VeraController
+    ):
+        """Init object."""
+        # target locked (state, time)
+        # this is used since sdata does not return proper job status for locks
+        self.lock_target: Optional[Tuple[str, float]] = None
+        super().__init__(json_obj, json_alerts, vera_controller)
 
     def set_lock_state(self, state: int) -> None:
         """Set the lock state, also update local state."""
@@ -1090,25 +1370,28 @@ class VeraLock(VeraDevice):
         # if the lock target matches now
         # or the locking action took too long
         # then reset the target and time
-        now = time.time()
-        if self.lock_target is not None and (
-            self.lock_target[0] == self.get_value("locked")
-            or now - self.lock_target[1] >= LOCK_TARGET_TIMEOUT_SEC
-        ):
-            LOG.debug(
-                "Resetting lock target for %s (%s==%s, %s - %s >= %s)",
-                self.name,
-                self.lock_target[0],
-                self.get_value("locked"),
-                now,
-                self.lock_target[1],
-                LOCK_TARGET_TIMEOUT_SEC,
-            )
-            self.lock_target = None
+        state = self.get_strict_value("locked")
+        lock_target = self.lock_target
+        if lock_target is not None:
+            now = time.time()
+            if (
+                lock_target[0] == state
+                or now - lock_target[1] >= LOCK_TARGET_TIMEOUT_SEC
+            ):
+                LOG.debug(
+                    "Resetting lock target for %s (%s==%s, %s - %s >= %s)",
+                    self.name,
+                    lock_target[0],
+                    state,
+                    now,
+                    lock_target[1],
+                    LOCK_TARGET_TIMEOUT_SEC,
+                )
+                self.lock_target = lock_target = None
 
-        locked = cast(str, self.get_value("locked")) == "1"
-        if self.lock_target is not None:
-            locked = cast(str, self.lock_target[0]) == "1"
+        locked = cast(str, state) == "1"
+        if lock_target is not None:
+            locked = cast(str, lock_target[0]) == "1"
             LOG.debug("Lock still in progress for %s: target=%s", self.name, locked)
         return locked
 
@@ -1117,6 +1400,11 @@ class VeraLock(VeraDevice):
         # Syntax string: UserID="<pin_slot>" UserName="<pin_code_name>"
         # See http://wiki.micasaverde.com/index.php/Luup_UPnP_Variables_and_Actions#DoorLock1
 
+        # The common case matches in one go without tokenizing with shlex
+        match = VeraLock._USER_CODE_RE.fullmatch(user_code)
+        if match is not None:
+            return (match.group(1), match.group(2))
+
         try:
             # Get the UserID="" and UserName="" fields separately
             raw_userid, raw_username = shlex.split(user_code)
@@ -1184,6 +1472,17 @@ class VeraLock(VeraDevice):
     # with an identical value) by using the Lua function luup.variable_watch().
     # No equivalent appears to exist in the HTTP API.
 
+    def refresh_lock_events(self) -> None:
+        """Refresh the last user and the three failure states in one go.
+
+        Use this before reading get_last_user, get_pin_failed, get_unauth_user
+        and get_lock_failed from the local cache, instead of passing refresh to
+        each of them.
+        """
+        self.refresh_complex_values(
+            ("sl_UserCode", "sl_PinFailed", "sl_UnauthUser", "sl_LockFailure")
+        )
+
     def get_pin_failed(self, refresh: bool = False) -> bool:
         """Get if pin failed. True when a bad PIN code was entered."""
         if refresh:
@@ -1209,39 +1508,36 @@ class VeraLock(VeraDevice):
         """
         if refresh:
             self.refresh()
-        val = self.get_value("pincodes")
+        val = self.get_strict_value("pincodes")
 
         # val syntax string: <VERSION=3>next_available_user_code_id\tuser_code_id,active,date_added,date_used,PIN_code,name;\t...
         # See (outdated) http://wiki.micasaverde.com/index.php/Luup_UPnP_Variables_and_Actions#DoorLock1
 
-        # Remove the trailing tab
-        # ignore the version and next available at the start
-        # and split out each set of code attributes
-        raw_code_list: List[str] = []
-        try:
-            raw_code_list = val.rstrip().split("\t")[1:]
-        # pylint: disable=broad-except
-        except Exception as ex:
-            LOG.error("Got unsupported string %s: %s", val, ex)
-
-        # Loop to create a list of codes
-        codes = []
-        for code in raw_code_list:
-            try:
-                # Strip off trailing semicolon
-                # Create a list from csv
-                code_addrs = code.split(";")[0].split(",")
-
-                # Get the code ID (slot) and see if it should have values
-                slot, active = code_addrs[:2]
-                if active != "0":
-                    # Since it has additional attributes, get the remaining ones
-                    _, _, pin, name = code_addrs[2:6]
-                    # And add them as a tuple to the list
-                    codes.append((slot, name, pin))
-            # pylint: disable=broad-except
-            except Exception as ex:
-                LOG.error("Problem parsing pin code string %s: %s", code, ex)
+        if not isinstance(val, str):
+            LOG.error("Got unsupported string %s", val)
+            return []
+
+        # Remove the trailing tab, ignore the version and next available id at
+        # the start and split out each set of code attributes
+        codes: List[LockCode] = []
+        for code in val.rstrip().split("\t")[1:]:
+            # Strip off the trailing semicolon and split the csv fields
+            code_addrs = code.partition(";")[0].split(",")
+
+            # Get the code ID (slot) and see if it should have values
+            if len(code_addrs) < 2:
+                LOG.error("Problem parsing pin code string %s", code)
+                continue
+            slot, active = code_addrs[:2]
+            if active == "0":
+                continue
+
+            # Since it has additional attributes, get the remaining ones
+            if len(code_addrs) < 6:
+                LOG.error("Problem parsing pin code string %s", code)
+                continue
+            _, _, pin, name = code_addrs[2:6]
+            codes.append((slot, name, pin))
 
         return codes
 
@@ -1254,21 +1550,23 @@ class VeraLock(VeraDevice):
 class VeraThermostat(VeraDevice):
     """Class to represent a thermostat."""
 
+    __slots__ = ()
+
     def set_temperature(self, temp: float) -> None:
         """Set current goal temperature / setpoint."""
 
-        self.set_service_value(
-            self._thermostat_setpoint, "CurrentSetpoint", "NewCurrentSetpoint", temp
-        )
+        # Work out which setpoint is in use once for both calls
+        cache_value_name, service = self._setpoint()
+        self.set_service_value(service, "CurrentSetpoint", "NewCurrentSetpoint", temp)
 
-        self.set_cache_value(self._setpoint_cache_value_name, temp)
+        self.set_cache_value(cache_value_name, temp)
 
     def get_current_goal_temperature(self, refresh: bool = False) -> Optional[float]:
         """Get current goal temperature / setpoint."""
         if refresh:
             self.refresh()
         try:
-            return float(self.get_value(self._setpoint_cache_value_name))
+            return float(self.get_strict_value(self._setpoint_cache_value_name))
         except (TypeError, ValueError):
             return None
 
@@ -1277,7 +1575,7 @@ class VeraThermostat(VeraDevice):
         if refresh:
             self.refresh()
         try:
-            return float(self.get_value("temperature"))
+            return float(self.get_strict_value("temperature"))
         except (TypeError, ValueError):
             return None
 
@@ -1292,7 +1590,7 @@ class VeraThermostat(VeraDevice):
         """Get the hvac mode."""
         if refresh:
             self.refresh()
-        return cast(str, self.get_value("mode"))
+        return cast(str, self.get_strict_value("mode"))
 
     def turn_off(self) -> None:
         """Set hvac mode to off."""
@@ -1327,13 +1625,13 @@ class VeraThermostat(VeraDevice):
         """Get fan mode."""
         if refresh:
             self.refresh()
-        return cast(str, self.get_value("fanmode"))
+        return cast(str, self.get_strict_value("fanmode"))
 
     def get_hvac_state(self, refresh: bool = False) -> Optional[str]:
         """Get current hvac state."""
         if refresh:
             self.refresh()
-        return cast(str, self.get_value("hvacstate"))
+        return cast(str, self.get_strict_value("hvacstate"))
 
     def fan_auto(self) -> None:
         """Set fan to automatic."""
@@ -1345,17 +1643,17 @@ class VeraThermostat(VeraDevice):
 
     def _has_double_setpoints(self) -> bool:
         """Determines if a thermostate has two setpoints"""
-        if self.get_value("setpoint"):
+        if self.get_strict_value("setpoint"):
             return False
 
-        if self.get_value("heatsp") and self.get_value("coolsp"):
+        if self.get_strict_value("heatsp") and self.get_strict_value("coolsp"):
             return True
 
         return False
 
     def _is_heating_recommended(self) -> bool:
-        mode = self.get_value("mode")
-        state = self.get_value("hvacstate")
+        mode = self.get_strict_value("mode")
+        state = self.get_strict_value("hvacstate")
 
         if mode == "HeatOn":
             return True
@@ -1371,30 +1669,31 @@ class VeraThermostat(VeraDevice):
 
         return True
 
-    @property
-    def _setpoint_cache_value_name(self) -> str:
+    def _setpoint(self) -> Tuple[str, str]:
+        """Get the dev_info name and the service of the setpoint in use.
+
+        Both come from the same few values, so they are worked out together.
+        """
         if self._has_double_setpoints():
             if self._is_heating_recommended():
-                return "heatsp"
-            else:
-                return "coolsp"
-        else:
-            return "setpoint"
+                return "heatsp", self.thermostat_heat_setpoint
+            return "coolsp", self.thermostat_cool_setpoint
+        return "setpoint", self.thermostat_setpoint
+
+    @property
+    def _setpoint_cache_value_name(self) -> str:
+        return self._setpoint()[0]
 
     @property
     def _thermostat_setpoint(self) -> str:
-        if self._has_double_setpoints():
-            if self._is_heating_recommended():
-                return self.thermostat_heat_setpoint
-            else:
-                return self.thermostat_cool_setpoint
-        else:
-            return self.thermostat_setpoint
+        return self._setpoint()[1]
 
 
 class VeraSceneController(VeraDevice):
     """Class to represent a scene controller."""
 
+    __slots__ = ()
+
     def get_last_scene_id(self, refresh: bool = False) -> str:
         """Get last scene id.
 
@@ -1402,8 +1701,7 @@ class VeraSceneController(VeraDevice):
         Refresh is only needed if you're not using subscriptions.
         """
         if refresh:
-            self.refresh_complex_value("LastSceneID")
-            self.refresh_complex_value("sl_CentralScene")
+            self.refresh_complex_values(("LastSceneID", "sl_CentralScene"))
         val = self.get_complex_value("LastSceneID") or self.get_complex_value(
             "sl_CentralScene"
         )
@@ -1452,15 +1750,12 @@ class VeraScene:
         """Get a string representation."""
         return f"{self.__class__.__name__} (id={self.scene_id} name={self.name})"
 
-    @property
-    def scene_service(self) -> str:
-        """Vera service string for switch."""
-        return "urn:micasaverde-com:serviceId:HomeAutomationGateway1"
+    # Vera service string for scenes, a constant like the VeraDevice ones
+    scene_service = "urn:micasaverde-com:serviceId:HomeAutomationGateway1"
 
     def vera_request(self, **kwargs: str) -> requests.Response:
         """Perfom a vera_request for this scene."""
-        request_payload = {"output_format": "json", "SceneNum": self.scene_id}
-        request_payload.update(kwargs)
+        request_payload = {"output_format": "json", "SceneNum": self.scene_id, **kwargs}
 
         return self.vera_controller.data_request(request_payload)
 
@@ -1475,11 +1770,13 @@ class VeraScene:
             "serviceId": self.scene_service,
         }
         result = self.vera_request(**payload)
-        LOG.debug(
-            "activate: " "result of vera_request with payload %s: %s",
-            payload,
-            result.text,
-        )
+        self.vera_controller.invalidate_sdata()
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug(
+                "activate: " "result of vera_request with payload %s: %s",
+                payload,
+                result.text,
+            )
 
         self._active = True
 
@@ -1492,7 +1789,7 @@ class VeraScene:
 
         Only needed if you're not using subscriptions.
         """
-        j = self.vera_request(id="sdata", output_format="json").json()
+        j = self.vera_controller.get_sdata()
         scenes = j.get("scenes")
         for scene_data in scenes:
             if scene_data.get("id") == self.scene_id:
@@ -1517,6 +1814,24 @@ class VeraScene:
 class VeraGarageDoor(VeraSwitch):
     """Garage door device."""
 
+    __slots__ = ()
+
+
+# Device class used for each Vera category, anything else is a plain VeraDevice
+CATEGORY_DEVICE_CLASSES: Dict[int, Type[VeraDevice]] = {
+    CATEGORY_DIMMER: VeraDimmer,
+    CATEGORY_SWITCH: VeraSwitch,
+    CATEGORY_VERA_SIREN: VeraSwitch,
+    CATEGORY_THERMOSTAT: VeraThermostat,
+    CATEGORY_LOCK: VeraLock,
+    CATEGORY_CURTAIN: VeraCurtain,
+    CATEGORY_ARMABLE: VeraBinarySensor,
+    **dict.fromkeys(SENSOR_CATEGORIES, VeraSensor),
+    CATEGORY_SCENE_CONTROLLER: VeraSceneController,
+    CATEGORY_REMOTE: VeraSceneController,
+    CATEGORY_GARAGE_DOOR: VeraGarageDoor,
+}
+
 
 class VeraAlert:
     """An alert triggered by variable state change."""
@@ -1619,6 +1934,10 @@ class AbstractSubscriptionRegistry(ABC):
             else:
                 LOG.debug("Got invalid alert_data: %s", alert_data)
 
+        # Cached sdata predates these changes, so don't refresh devices from it
+        if device_ids and self._controller:
+            self._controller.invalidate_sdata()
+
         for device_id in device_ids:
             try:
                 device_list = self._devices.get(int(device_id), ())
@@ -1651,13 +1970,15 @@ class AbstractSubscriptionRegistry(ABC):
         state = int(device_data.get("state", STATE_NOT_PRESENT))
         comment = device_data.get("comment", "")
         sending = comment.find("Sending") >= 0
-        LOG.debug(
-            "Event: %s, state %s, alerts %s, %s",
-            device.name,
-            state,
-            len(device_alerts),
-            json.dumps(device_data),
-        )
+        # Only serialize the event when it is actually logged
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug(
+                "Event: %s, state %s, alerts %s, %s",
+                device.name,
+                state,
+                len(device_alerts),
+                json.dumps(device_data),
+            )
         device.set_alerts(device_alerts)
         if sending and state == STATE_NO_JOB:
             state = STATE_JOB_WAITING_TO_START
@@ -1754,9 +2075,9 @@ class AbstractSubscriptionRegistry(ABC):
                 data_changed = False
             self._last_updated = new_timestamp
         except requests.RequestException as ex:
-            LOG.debug("Caught RequestException: %s", str(ex))
+            LOG.debug("Caught RequestException: %s", ex)
         except PyveraError as ex:
-            LOG.debug("Non-fatal error in poll: %s", str(ex))
+            LOG.debug("Non-fatal error in poll: %s", ex)
         except Exception as ex:
             LOG.exception("Vera poll thread general exception: %s", str(ex))
             raise
@@ -1805,8 +2126,14 @@ class SubscriptionRegistry(AbstractSubscriptionRegistry):
         LOG.info("Terminated thread")
 
     def _run_poll_server(self) -> None:
+        retry = SUBSCRIPTION_RETRY
         while not self._exiting.wait(timeout=1):
-            if not self.poll_server_once():
-                self._exiting.wait(timeout=SUBSCRIPTION_RETRY)
+            if self.poll_server_once():
+                retry = SUBSCRIPTION_RETRY
+            else:
+                self._exiting.wait(timeout=retry)
+                # Back off while the Vera stays down instead of hitting it every
+                # few seconds, the first success goes back to the short wait
+                retry = min(retry * 2, SUBSCRIPTION_RETRY_MAX)
 
         LOG.info("Shutdown Vera Poll Thread")
@@ -1,11 +1,14 @@
 """Test module."""
 import logging
+import socket
+import threading
 import time
-from typing import Any, NamedTuple, cast
-from unittest.mock import MagicMock
+from typing import Any, List, NamedTuple, cast
+from unittest.mock import MagicMock, patch
 
 import pytest
 import pyvera
+import requests
 from pyvera import (
     CATEGORY_LOCK,
     STATE_JOB_IN_PROGRESS,
@@ -14,6 +17,7 @@ from pyvera import (
     VeraBinarySensor,
     VeraController,
     VeraCurtain,
+    VeraDevice,
     VeraDimmer,
     VeraLock,
     VeraSceneController,
@@ -61,6 +65,133 @@ def test_controller_refresh_data(vera_controller_data: VeraControllerData) -> No
     assert controller.serial_number == "fake_serial_number"
 
 
+# pylint: disable=protected-access
+def test_controller_session(vera_controller_data: VeraControllerData) -> None:
+    """Test function."""
+    controller = vera_controller_data.controller
+
+    with patch("requests.get", side_effect=AssertionError("Session not used")):
+        assert controller.get_devices()
+        assert controller.refresh_data()
+
+    for session in (controller._session, controller._poll_session):
+        pool_kw = session.get_adapter(
+            controller.base_url
+        ).poolmanager.connection_pool_kw
+        assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in pool_kw["socket_options"]
+        assert (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) in pool_kw["socket_options"]
+        for name, value in (
+            ("TCP_KEEPIDLE", pyvera.KEEPALIVE_IDLE),
+            ("TCP_KEEPINTVL", pyvera.KEEPALIVE_INTERVAL),
+            ("TCP_KEEPCNT", pyvera.KEEPALIVE_COUNT),
+        ):
+            if hasattr(socket, name):
+                option = (socket.IPPROTO_TCP, getattr(socket, name), value)
+                assert option in pool_kw["socket_options"]
+
+    assert (
+        pyvera.KEEPALIVE_IDLE + pyvera.KEEPALIVE_INTERVAL * pyvera.KEEPALIVE_COUNT
+        < pyvera.TIMEOUT
+    )
+
+    with patch.object(controller._session, "close") as close, patch.object(
+        controller._poll_session, "close"
+    ) as poll_close:
+        controller.stop()
+        close.assert_called_once_with()
+        poll_close.assert_called_once_with()
+
+
+def test_controller_no_read_retries() -> None:
+    """Test function."""
+    # A server that takes requests but never answers them
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    accepted: List[socket.socket] = []
+
+    def accept() -> None:
+        while True:
+            accepted.append(server.accept()[0])
+
+    threading.Thread(target=accept, daemon=True).start()
+    controller = VeraController(f"http://127.0.0.1:{server.getsockname()[1]}")
+    try:
+        with pytest.raises(requests.Timeout):
+            controller.data_request({"id": "lu_action"}, timeout=1)
+        assert len(accepted) == 1
+    finally:
+        controller.close()
+        server.close()
+
+
+def test_controller_sdata_cache(vera_controller_data: VeraControllerData) -> None:
+    """Test function."""
+    controller = vera_controller_data.controller
+
+    # Pin the TTL so the counts don't depend on how fast the calls run
+    with patch.object(pyvera, "SDATA_TTL", 3600), patch.object(
+        controller, "data_request", wraps=controller.data_request
+    ) as data_request:
+        switch = cast(VeraSwitch, controller.get_device_by_id(DEVICE_SWITCH_ID))
+        controller.get_scenes()
+        controller.map_services()
+        for device in controller.devices:
+            device.refresh()
+        # Two status calls and a single sdata one
+        assert data_request.call_count == 3
+
+        # Changing state drops the cached answer
+        switch.switch_on()
+        assert data_request.call_count == 4
+        switch.refresh()
+        controller.get_scenes()
+        assert data_request.call_count == 5
+
+        # So do changes delivered by the subscription thread
+        controller.subscription_registry._event([{"id": DEVICE_SWITCH_ID}], [])
+        switch.refresh()
+        assert data_request.call_count == 6
+
+    # An answer fetched while the cache was dropped isn't kept
+    def invalidating_request(payload: dict) -> Any:
+        controller.invalidate_sdata()
+        return request(payload)
+
+    request = controller.data_request
+    controller.invalidate_sdata()
+    with patch.object(pyvera, "SDATA_TTL", 3600), patch.object(
+        controller, "data_request", side_effect=invalidating_request
+    ) as data_request:
+        switch.refresh()
+        switch.refresh()
+        assert data_request.call_count == 2
+
+    # Past the TTL the answer is fetched again
+    with patch.object(pyvera, "SDATA_TTL", 0), patch.object(
+        controller, "data_request", wraps=controller.data_request
+    ) as data_request:
+        switch.refresh()
+        switch.refresh()
+        assert data_request.call_count == 2
+
+
+def test_controller_run_in_parallel(vera_controller_data: VeraControllerData) -> None:
+    """Test function."""
+    controller = vera_controller_data.controller
+    switches = [
+        cast(VeraSwitch, controller.get_device_by_id(device_id))
+        for device_id in (DEVICE_SWITCH_ID, DEVICE_SWITCH2_ID)
+    ]
+
+    assert controller.run_in_parallel([]) == []
+    assert controller.run_in_parallel(switch.switch_on for switch in switches) == [
+        None,
+        None,
+    ]
+    assert all(switch.is_switched_on(refresh=True) for switch in switches)
+
+
 # pylint: disable=protected-access
 def test__event_device_for_vera_lock_status() -> None:
     """Test function."""
@@ -110,6 +241,25 @@ def test__event_device_for_vera_lock_status() -> None:
     mock_lock.update.assert_called_once_with(device_json)
 
 
+# pylint: disable=protected-access
+def test_subscription_retry_backoff() -> None:
+    """Test function."""
+    registry = SubscriptionRegistry()
+    waits: List[float] = []
+
+    def wait(timeout: float) -> bool:
+        waits.append(timeout)
+        return len(waits) >= 8
+
+    with patch.object(registry, "_exiting") as exiting, patch.object(
+        registry, "poll_server_once", side_effect=[False, False, True, False]
+    ):
+        exiting.wait.side_effect = wait
+        registry._run_poll_server()
+
+    assert waits == [1, 9, 1, 18, 1, 1, 9, 1]
+
+
 def test_refresh_data(vera_controller_data: VeraControllerData) -> None:
     """Test function."""
     controller = vera_controller_data.controller
@@ -120,6 +270,59 @@ def test_refresh_data(vera_controller_data: VeraControllerData) -> None:
     assert services is None
 
 
+def test_controller_reuses_devices(vera_controller_data: VeraControllerData) -> None:
+    """Test function."""
+    controller = vera_controller_data.controller
+    devices = controller.get_devices()
+    assert len(devices) == len(controller.get_devices())
+    assert all(a is b for a, b in zip(devices, controller.get_devices()))
+
+
+def test_controller_device_lookups(vera_controller_data: VeraControllerData) -> None:
+    """Test function."""
+    controller = vera_controller_data.controller
+
+    # Pin the TTL so only the lookups decide what gets fetched
+    with patch.object(pyvera, "SDATA_TTL", 3600), patch.object(
+        controller, "data_request", wraps=controller.data_request
+    ) as data_request:
+        switch = controller.get_device_by_id(DEVICE_SWITCH_ID)
+        assert switch is not None
+        assert data_request.call_count == 2
+
+        assert controller.get_device_by_name(switch.name) is switch
+        assert controller.get_device_by_id(DEVICE_SWITCH_ID) is switch
+        assert data_request.call_count == 2
+
+        # Unknown devices may have been added since, so those fetch again
+        assert controller.get_device_by_id(-1) is None
+        assert data_request.call_count == 3
+
+
+def test_controller_category_filter(vera_controller_data: VeraControllerData) -> None:
+    """Test function."""
+    controller = vera_controller_data.controller
+    devices = controller.get_devices(["On/Off Switch", "Lock"])
+    assert devices
+    assert {device.category_name for device in devices} == {"On/Off Switch", "Lock"}
+    assert controller.get_devices("Dimmable Switch, Lock") == [
+        device
+        for device in controller.devices
+        if device.category_name in ("Dimmable Switch", "Lock")
+    ]
+
+
+def test_device_update(vera_controller_data: VeraControllerData) -> None:
+    """Test function."""
+    device = VeraDevice(
+        {"id": 1, "deviceInfo": {"name": "Device", "level": "", "status": "0"}},
+        [],
+        vera_controller_data.controller,
+    )
+    device.update({"level": "50", "status": "1", "unknown": "1"})
+    assert device.get_all_values() == {"name": "Device", "level": "50", "status": "1"}
+
+
 def test_polling(vera_controller_data: VeraControllerData) -> None:
     """Test function."""
     controller = vera_controller_data.controller
@@ -266,6 +469,48 @@ def test_lock(vera_controller_data: VeraControllerData) -> None:
     assert device.is_locked() is False
     assert device.set_new_pin(name="John Doe", pin=12121212).status_code == 200
     assert device.clear_slot_pin(slot=1).status_code == 200
+    device.refresh_lock_events()
+    assert device.get_pin_failed() is False
+
+
+# pylint: disable=protected-access
+def test_lock_user_code() -> None:
+    """Test function."""
+    assert VeraLock._parse_usercode('UserID="3" UserName="John Doe"') == (
+        "3",
+        "John Doe",
+    )
+    assert VeraLock._parse_usercode('UserID="" UserName=""') == ("", "")
+    assert VeraLock._parse_usercode('UserID="3" UserName="John \\"JJ\\" Doe"') == (
+        "3",
+        'John "JJ" Doe',
+    )
+    assert VeraLock._parse_usercode("UserID=3 UserName=John") == ("3", "John")
+    assert VeraLock._parse_usercode("None") is None
+
+
+def test_lock_pin_codes(vera_controller_data: VeraControllerData) -> None:
+    """Test function."""
+    device = VeraLock(
+        {
+            "id": 1,
+            "deviceInfo": {
+                "pincodes": "<VERSION=3>4\t1,1,2020-01-01,2020-01-02,1234,John Doe;"
+                "\t2,0;\t3,1,2020-01-01,0,5678,Jane;\t4,1,d,d,4321,Doe, John;"
+                "\t5,1,d,d,8765,John,x;\t6,1,d;\t"
+            },
+        },
+        [],
+        vera_controller_data.controller,
+    )
+    with patch.object(pyvera.LOG, "error") as log_error:
+        assert device.get_pin_codes() == [
+            ("1", "John Doe", "1234"),
+            ("3", "Jane", "5678"),
+            ("4", "Doe", "4321"),
+            ("5", "John", "8765"),
+        ]
+    log_error.assert_called_once_with("Problem parsing pin code string %s", "6,1,d;")
 
 
 # pylint: disable=protected-access
@@ -388,6 +633,9 @@ def test_dimmer(vera_controller_data: VeraControllerData) -> None:
     device.set_color([120, 130, 140])
     assert device.get_color() == [120, 130, 140]
 
+    device.set_cache_complex_value("SupportedColors", "B,G,R")
+    assert device.get_color_index(["R", "G", "B"]) == [2, 1, 0]
+
     device.switch_off()
     assert device.is_switched_on() is False
 